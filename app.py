@@ -2,22 +2,14 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import joblib
-import plotly.express as px
 import plotly.graph_objects as go
 
-st.set_page_config(
-    page_title="Flood Risk Lhokseumawe",
-    page_icon="🌊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.markdown("""
+_CSS = """
     <style>
     .main {
         background-color: #f8f9fa;
     }
-    .stButton>button {
+    .stButton>button, .stFormSubmitButton>button {
         width: 100%;
         border-radius: 5px;
         background-color: #007bff;
@@ -46,7 +38,16 @@ st.markdown("""
         color: #2c3e50;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+st.set_page_config(
+    page_title="Flood Risk Lhokseumawe",
+    page_icon="🌊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 @st.cache_resource
 def load_models():
@@ -60,39 +61,122 @@ def load_models():
 
 model, scaler = load_models()
 
-def get_cluster_info(model, scaler):
+@st.cache_resource
+def get_cluster_info(_model, _scaler):
     """
     Mengidentifikasi label klaster (0, 1, 2) menjadi tingkat risiko
     berdasarkan karakteristik centroid (Elevasi & Curah Hujan).
     """
-    centers_scaled = model.cluster_centers_
-    centers_original = scaler.inverse_transform(centers_scaled)
-    
-    df_centers = pd.DataFrame(centers_original, columns=['Curah_Hujan', 'Elevasi'])
-    df_centers['Cluster_Label'] = range(len(df_centers))
+    centers_scaled = _model.cluster_centers_
+    centers_original = _scaler.inverse_transform(centers_scaled)
     
-    df_sorted = df_centers.sort_values(by='Elevasi').reset_index(drop=True)
+    # Urutkan klaster dari elevasi terendah (paling rawan) ke tertinggi
+    order = np.argsort(centers_original[:, 1], kind='stable')
     
-    
-    risk_mapping = {}
-    colors = {}
+    k = len(centers_original)
+    risk_by_id = [None] * k
+    color_by_id = [None] * k
     
     labels = ["Sangat Rawan (Bahaya)", "Waspada (Siaga)", "Aman"]
     color_codes = ["#FF4B4B", "#FFA500", "#28A745"]
     
-    for i in range(len(df_sorted)):
-        original_label = df_sorted.loc[i, 'Cluster_Label']
+    for i, original_label in enumerate(order.tolist()):
         if i < len(labels):
-            risk_mapping[original_label] = labels[i]
-            colors[original_label] = color_codes[i]
+            risk_by_id[original_label] = labels[i]
+            color_by_id[original_label] = color_codes[i]
         else:
-            risk_mapping[original_label] = f"Level {i}"
-            colors[original_label] = "#808080"
+            risk_by_id[original_label] = f"Level {i}"
+            color_by_id[original_label] = "#808080"
+
+    df_centers = pd.DataFrame(centers_original, columns=['Curah_Hujan', 'Elevasi'])
+    df_centers['Cluster_Label'] = range(k)
+
+    # Kotak status hasil prediksi untuk setiap klaster
+    status_html_by_id = [f"""
+            <div style="background-color: {color_by_id[c]}; color: white; padding: 10px; border-radius: 5px; text-align: center;">
+                <h4 style="margin:0; color:white;">Status: {risk_by_id[c]}</h4>
+            </div>
+            """ for c in range(k)]
             
-    return df_centers, risk_mapping, colors
+    return {
+        'df_centers': df_centers,
+        'risk_by_id': risk_by_id,
+        'color_by_id': color_by_id,
+        'status_html_by_id': status_html_by_id,
+    }
+
+@st.cache_resource
+def build_display_df(_model, _scaler):
+    """
+    Menyusun tabel karakteristik centroid per kategori risiko untuk tab informasi.
+    """
+    cluster_info = get_cluster_info(_model, _scaler)
+    df_centers = cluster_info['df_centers']
+    risk_by_id = cluster_info['risk_by_id']
+
+    df_display = df_centers.copy()
+    df_display['Kategori Risiko'] = [risk_by_id[c] for c in df_display['Cluster_Label']]
+    df_display = df_display[['Kategori Risiko', 'Curah_Hujan', 'Elevasi']]
+    df_display.columns = ['Kategori Risiko', 'Rata-rata Curah Hujan (mm)', 'Rata-rata Elevasi (mdpl)']
+    return df_display
+
+@st.cache_resource
+def get_predict_params(_model, _scaler):
+    """
+    Menyimpan parameter scaler dan centroid sebagai array NumPy
+    agar prediksi tidak perlu melewati validasi input sklearn.
+    """
+    mean = np.asarray(_scaler.mean_, dtype=np.float64)
+    scale = np.asarray(_scaler.scale_, dtype=np.float64)
+    centers = np.asarray(_model.cluster_centers_, dtype=np.float64)
+    return mean, scale, centers
+
+@st.cache_resource
+def build_base_fig(df_centers, risk_by_id, color_by_id):
+    """
+    Membuat figure dasar berisi centroid klaster dan layout,
+    cukup sekali karena tidak bergantung pada input pengguna.
+    """
+    fig = go.Figure()
+    
+    # Semua centroid digambar dalam satu trace, bukan satu trace per klaster
+    fig.add_trace(go.Scattergl(
+        x=df_centers['Curah_Hujan'].to_numpy(),
+        y=df_centers['Elevasi'].to_numpy(),
+        mode='markers+text',
+        marker=dict(size=25, color=color_by_id, opacity=0.3),
+        text=[f"Pusat {r}" for r in risk_by_id],
+        textposition="bottom center",
+        hoverinfo='skip',
+        name="Pusat Klaster"
+    ))
+
+    fig.update_layout(
+        title="Peta Sebaran Klaster (Curah Hujan vs Elevasi)",
+        xaxis_title="Curah Hujan (mm)",
+        yaxis_title="Elevasi (mdpl)",
+        template="plotly_white",
+        height=500,
+        hovermode="closest",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+def predict_cluster(val_hujan, val_elevasi, mean, scale, centers):
+    """
+    Menstandarkan input lalu mengembalikan id klaster dengan centroid terdekat.
+    """
+    x = (np.array([val_hujan, val_elevasi]) - mean) / scale
+    return int(np.argmin(((centers - x) ** 2).sum(axis=1)))
 
 if model is not None:
-    df_centers, risk_map, color_map = get_cluster_info(model, scaler)
+    if 'cluster_info' not in st.session_state:
+        st.session_state.cluster_info = get_cluster_info(model, scaler)
+    cluster_info = st.session_state.cluster_info
+    df_centers = cluster_info['df_centers']
+    risk_by_id = cluster_info['risk_by_id']
+    color_by_id = cluster_info['color_by_id']
+    status_html_by_id = cluster_info['status_html_by_id']
 
 with st.sidebar:
     st.title("Sistem Prediksi Banjir")
@@ -101,91 +185,74 @@ with st.sidebar:
     st.markdown("---")
     st.header("🔧 Input Parameter")
     
-    input_kecamatan = st.selectbox("Pilih Kecamatan", 
-                                   ["Banda Sakti", "Blang Mangat", "Muara Dua", "Muara Satu"])
+    # Form agar script hanya rerun saat tombol ditekan, bukan setiap slider digeser
+    with st.form("inputs"):
+        input_kecamatan = st.selectbox("Pilih Kecamatan", 
+                                       ["Banda Sakti", "Blang Mangat", "Muara Dua", "Muara Satu"])
+        
+        input_gampong = st.text_input("Nama Desa (Opsional)", "Contoh: Hagu Teungoh")
+        
+        val_hujan = st.slider("🌧️ Curah Hujan (mm/bulan)", min_value=0.0, max_value=600.0, value=250.0, step=0.1)
+        val_elevasi = st.slider("⛰️ Elevasi (mdpl)", min_value=0.0, max_value=100.0, value=5.0, step=0.1)
+        
+        btn_predict = st.form_submit_button("Analisa Tingkat Kerawanan")
+
+st.title("🌊 Dashboard Kerawanan Banjir Kota Lhokseumawe")
+st.markdown(f"Selamat datang di sistem pendukung keputusan mitigasi bencana. Data input: **{input_kecamatan}**.")
+
+def predict_block(val_hujan, val_elevasi, input_kecamatan):
+    """
+    Menampilkan hasil prediksi, metrik input, dan plot posisi data
+    terhadap centroid klaster.
+    """
+    mean, scale, centers = get_predict_params(model, scaler)
+    prediction = predict_cluster(val_hujan, val_elevasi, mean, scale, centers)
+    result_text = risk_by_id[prediction]
     
-    input_gampong = st.text_input("Nama Desa (Opsional)", "Contoh: Hagu Teungoh")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="Curah Hujan Input", value=f"{val_hujan} mm")
+    with col2:
+        st.metric(label="Elevasi Input", value=f"{val_elevasi} mdpl")
+    with col3:
+        st.markdown(status_html_by_id[prediction], unsafe_allow_html=True)
+        
+    st.markdown("---")
     
-    val_hujan = st.slider("🌧️ Curah Hujan (mm/bulan)", min_value=0.0, max_value=600.0, value=250.0, step=0.1)
-    val_elevasi = st.slider("⛰️ Elevasi (mdpl)", min_value=0.0, max_value=100.0, value=5.0, step=0.1)
+    st.subheader("📍 Posisi Data dalam Klaster")
     
-    btn_predict = st.button("Analisa Tingkat Kerawanan")
+    fig = go.Figure(build_base_fig(df_centers, risk_by_id, color_by_id))
 
-st.title("🌊 Dashboard Kerawanan Banjir Kota Lhokseumawe")
-st.markdown(f"Selamat datang di sistem pendukung keputusan mitigasi bencana. Data input: **{input_kecamatan}**.")
+    fig.add_trace(go.Scattergl(
+        x=[val_hujan],
+        y=[val_elevasi],
+        mode='markers+text',
+        marker=dict(size=15, color='blue', line=dict(width=2, color='DarkSlateGrey')),
+        text=["📍 Lokasi Anda"],
+        textposition="top center",
+        name="Input Data"
+    ))
+    
+    st.plotly_chart(
+        fig,
+        use_container_width=True,
+        config={'displayModeBar': False, 'staticPlot': False, 'scrollZoom': False, 'doubleClick': False}
+    )
+    
+    st.info(f"**Analisa:** Daerah dengan elevasi **{val_elevasi} mdpl** dan curah hujan **{val_hujan} mm** dikategorikan sebagai **{result_text}**. Disarankan untuk melakukan pengecekan drainase rutin di area {input_kecamatan}.")
 
 tab1, tab2 = st.tabs(["📊 Analisa & Prediksi", "ℹ️ Informasi Klaster"])
 
 with tab1:
     if model is not None:
-        input_data = np.array([[val_hujan, val_elevasi]])
-        input_scaled = scaler.transform(input_data)
-        
-        prediction = model.predict(input_scaled)[0]
-        result_text = risk_map[prediction]
-        result_color = color_map[prediction]
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric(label="Curah Hujan Input", value=f"{val_hujan} mm")
-        with col2:
-            st.metric(label="Elevasi Input", value=f"{val_elevasi} mdpl")
-        with col3:
-            st.markdown(f"""
-            <div style="background-color: {result_color}; color: white; padding: 10px; border-radius: 5px; text-align: center;">
-                <h4 style="margin:0; color:white;">Status: {result_text}</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        st.markdown("---")
-        
-        st.subheader("📍 Posisi Data dalam Klaster")
-        
-        fig = go.Figure()
-        
-        for idx, row in df_centers.iterrows():
-            cluster_id = row['Cluster_Label']
-            fig.add_trace(go.Scatter(
-                x=[row['Curah_Hujan']], 
-                y=[row['Elevasi']],
-                mode='markers',
-                marker=dict(size=25, color=color_map[cluster_id], opacity=0.3),
-                name=f"Pusat {risk_map[cluster_id]}"
-            ))
-
-        fig.add_trace(go.Scatter(
-            x=[val_hujan],
-            y=[val_elevasi],
-            mode='markers+text',
-            marker=dict(size=15, color='blue', line=dict(width=2, color='DarkSlateGrey')),
-            text=["📍 Lokasi Anda"],
-            textposition="top center",
-            name="Input Data"
-        ))
-
-        fig.update_layout(
-            title="Peta Sebaran Klaster (Curah Hujan vs Elevasi)",
-            xaxis_title="Curah Hujan (mm)",
-            yaxis_title="Elevasi (mdpl)",
-            template="plotly_white",
-            height=500,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        st.info(f"**Analisa:** Daerah dengan elevasi **{val_elevasi} mdpl** dan curah hujan **{val_hujan} mm** dikategorikan sebagai **{result_text}**. Disarankan untuk melakukan pengecekan drainase rutin di area {input_kecamatan}.")
+        predict_block(val_hujan, val_elevasi, input_kecamatan)
 
 with tab2:
     st.header("Detail Pusat Klaster (Centroids)")
     st.markdown("Tabel berikut menunjukkan karakteristik rata-rata dari setiap kategori risiko yang dipelajari oleh Machine Learning.")
     
-    df_display = df_centers.copy()
-    df_display['Kategori Risiko'] = df_display['Cluster_Label'].map(risk_map)
-    df_display = df_display[['Kategori Risiko', 'Curah_Hujan', 'Elevasi']]
-    df_display.columns = ['Kategori Risiko', 'Rata-rata Curah Hujan (mm)', 'Rata-rata Elevasi (mdpl)']
-    
-    st.table(df_display)
+    if model is not None:
+        st.table(build_display_df(model, scaler))
     
     st.markdown("""
     **Penjelasan:**